@@ -6,18 +6,36 @@ Analyzes a task description or conversation log to identify potential knowledge
 gaps that should be addressed through web search before implementation.
 
 Usage:
-    assess_knowledge_gaps.py <task-description-file>
+    assess_knowledge_gaps.py <task-description-file> [more-files ...]
     assess_knowledge_gaps.py --text "Your task description here"
+    assess_knowledge_gaps.py --json "Your task description here"
+    echo "Your task description" | assess_knowledge_gaps.py --json
 
 Output:
     A structured report of identified knowledge gaps, suggested search queries,
     and ambiguity flags that should be clarified with the user.
 """
 
+import io
+import os
 import sys
-import json
 import re
-from pathlib import Path
+import contextlib
+import functools
+from dataclasses import asdict, dataclass, field
+
+
+def _fuse(patterns: list) -> str:
+    """Combine pattern sources into a single alternation searched in one call."""
+    return "|".join(f"(?:{p})" for p in patterns)
+
+
+def _folded(source: str) -> str:
+    """Return a keyword pattern source rewritten for casefolded text.
+
+    Only valid for patterns whose escapes are all lowercase (\\b, \\s, \\d).
+    """
+    return source.casefold()
 
 
 # Patterns that suggest domain-specific knowledge is needed
@@ -52,6 +70,17 @@ DOMAIN_INDICATORS = {
     ],
 }
 
+# Every domain in a single named-group regex so the text is scanned only once.
+# The keyword sets of different domains never overlap, so the leftmost match at
+# each position cannot hide another domain's hit. The keywords are plain
+# literals, so this is matched case-sensitively against casefolded text:
+# literal prefix scanning is much faster without re.IGNORECASE.
+ALL_DOMAINS_RX = re.compile(
+    "|".join(
+        f"(?P<{domain}>{_folded(_fuse(patterns))})" for domain, patterns in DOMAIN_INDICATORS.items()
+    )
+)
+
 # Patterns that suggest version-sensitive information
 VERSION_PATTERNS = [
     r"\b[vV]?\d+\.\d+(?:\.\d+)?\b",  # Version numbers like v1.2.3
@@ -59,10 +88,19 @@ VERSION_PATTERNS = [
     r"\b(upgrade|migrate|migration|breaking\s+change|deprecated)\b",
 ]
 
+# Version patterns are literal/numeric too; matched against casefolded text
+VERSION_RX = re.compile(_folded(_fuse(VERSION_PATTERNS)))
+
+# Cheap prefilter for VERSION_RX: any version match contains a digit or one
+# of these (casefolded) keywords. Keep in sync with VERSION_PATTERNS.
+_VERSION_KEYWORDS = ("latest", "newest", "current", "recent", "updated",
+                     "upgrade", "migrat", "breaking", "deprecated")
+_DIGIT_RX = re.compile(r"\d")
+
 # Patterns that indicate ambiguity
 AMBIGUITY_PATTERNS = {
     "scope": [
-        r"\b(fix|improve|update|refactor|clean\s+up|optimize)\b(?!.*\bspecifically\b)",
+        r"\b(fix|improve|update|refactor|clean\s+up|optimize)\b",  # see _is_excepted
         r"\b(everything|all|entire|whole)\b",
     ],
     "behavior": [
@@ -79,164 +117,507 @@ AMBIGUITY_PATTERNS = {
     ],
 }
 
+# Fused alternations: one search per ambiguity type. These keep re.IGNORECASE
+# and run on the original text so matched_text preserves the user's casing.
+AMBIG_RX = {
+    ambiguity_type: re.compile(_fuse(patterns), re.IGNORECASE)
+    for ambiguity_type, patterns in AMBIGUITY_PATTERNS.items()
+}
+
+# A scope edit ("fix", "update", ...) is not ambiguous when the rest of its
+# line says what "specifically" to change. Checked in a bounded window after
+# the keyword: an unbounded (?!.*...) lookahead rescans the rest of the line
+# for every keyword hit, which is quadratic on long lines.
+_SCOPE_EDIT_RX = re.compile(AMBIGUITY_PATTERNS["scope"][0], re.IGNORECASE)
+_SCOPE_EXCEPTION_RX = re.compile(r"\bspecifically\b", re.IGNORECASE)
+SCOPE_EXCEPTION_WINDOW = 200
+
+# Literal prematchers: every match of AMBIG_RX[type] contains one of these
+# (casefolded) substrings, so a type whose literals are all absent is skipped
+# without running its regex. Keep in sync with AMBIGUITY_PATTERNS.
+_AMBIGUITY_PREMATCHERS = {
+    "scope": ("fix", "improve", "update", "refactor", "clean", "optimize",
+              "everything", "all", "entire", "whole"),
+    "behavior": ("handle", "manage", "process",
+                 "gracefully", "properly", "correctly", "appropriately"),
+    "architecture": ("should", "best", "approach", "strategy", "pattern",
+                     "design", "architect", "structure", "organize"),
+    "priority": ("also", "plus", "additionally", "well",
+                 "first", "then", "after", "eventually"),
+}
+
+# Characters read at a time when streaming task files
+CHUNK_SIZE = 65536
+
+# Read-ahead appended to a window from the next one: its leading whitespace
+# and first non-blank line. All match context ends at a newline except
+# whitespace inside a multi-word term ("clean\nup"), which this covers as
+# long as the next window starts on a non-blank line (see _chunk_iter).
+_READ_AHEAD_RX = re.compile(r"\s*[^\n]*")
+
+# Capitalized words that may name a technology (e.g. "React", "Next.js").
+# Names shorter than three characters are excluded by the pattern itself: a
+# two-letter word only matches with a .js/.py/.rs suffix.
+TECH_PATTERN = re.compile(r"\b([A-Z][a-zA-Z]+(?:\.js|\.py|\.rs)|[A-Z][a-zA-Z]{2,})\b")
+
+# Upper bound on suggested search queries per analysis
+MAX_SUGGESTIONS = 20
+
+# Capitalized sentence starters that are not technology names, casefolded so
+# "THE" or "FOR" in all-caps text is filtered too
+_STOPWORDS = frozenset(
+    word.casefold() for word in ("The", "This", "That", "When", "What", "How", "For")
+)
+
+# How to resolve each type of ambiguity
+_CLARIFICATION_SUGGESTIONS = {
+    "scope": "Clarify the exact boundaries of the task. What is included and excluded?",
+    "behavior": "Specify expected behavior for error/edge cases. What should happen when things go wrong?",
+    "architecture": "Identify the architectural constraints and preferences before choosing an approach.",
+    "priority": "Determine which sub-tasks are most important and should be addressed first.",
+}
+
+# Generic research query for each detected domain
+_DOMAIN_QUERIES = {
+    "legal": "current regulatory requirements compliance",
+    "finance": "accounting standards current rules",
+    "infrastructure": "deployment best practices current",
+    "security": "security best practices OWASP current",
+    "database": "database optimization patterns",
+    "frontend": "frontend framework best practices current",
+    "ml_ai": "machine learning implementation patterns current",
+}
+
+# Integer domain ids in DOMAIN_INDICATORS order. Detection works on ids and
+# only the public results carry names; queries are a plain tuple index.
+DOMAIN_NAMES = tuple(DOMAIN_INDICATORS)
+DOMAIN_IDS = {name: i for i, name in enumerate(DOMAIN_NAMES)}
+DOMAIN_QUERY_TUPLE = tuple(_DOMAIN_QUERIES[name] for name in DOMAIN_NAMES)
+
+
+def _group_domain_ids(regex: re.Pattern) -> tuple:
+    """Map each group number of `regex` to the id of the domain it is named after."""
+    names = {index: name for name, index in regex.groupindex.items()}
+    return tuple(DOMAIN_IDS.get(names.get(index)) for index in range(regex.groups + 1))
+
+
+# ALL_DOMAINS_RX group number (match.lastindex) -> domain id
+_GROUP_DOMAIN_IDS = _group_domain_ids(ALL_DOMAINS_RX)
+
+
+@dataclass(slots=True)
+class AnalysisResult:
+    """Outcome of a knowledge gap analysis."""
+
+    domains_detected: list = field(default_factory=list)
+    version_sensitive: bool = False
+    ambiguity_flags: list = field(default_factory=list)
+    suggested_searches: list = field(default_factory=list)
+    confidence_assessment: str = "high"
 
-def analyze_text(text: str) -> dict:
+
+def analyze_text(text: str) -> AnalysisResult:
     """Analyze task description for knowledge gaps and ambiguity."""
-    results = {
-        "domains_detected": [],
-        "version_sensitive": False,
-        "ambiguity_flags": [],
-        "suggested_searches": [],
-        "confidence_assessment": "high",
-    }
-
-    text_lower = text.lower()
-
-    # Detect domains
-    for domain, patterns in DOMAIN_INDICATORS.items():
-        for pattern in patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                results["domains_detected"].append(domain)
-                break
-
-    # Check for version-sensitive content
-    for pattern in VERSION_PATTERNS:
-        if re.search(pattern, text, re.IGNORECASE):
-            results["version_sensitive"] = True
-            break
+    return _to_result(_analyze_cached(text))
+
+
+def analyze_chunks(chunks) -> AnalysisResult:
+    """Analyze text supplied as an iterable of consecutive windows.
+
+    Every chunk but the last must end with a newline (see _chunk_iter), so
+    that no line is split between two windows. Domains, version sensitivity
+    and ambiguity types stop being searched once they have fired.
+    """
+    return _to_result(_analyze_stream(chunks))
+
+
+def _to_result(snapshot: tuple) -> AnalysisResult:
+    """Rehydrate an analysis snapshot into a fresh, caller-owned result."""
+    domain_ids, version_sensitive, flags, searches, confidence = snapshot
+    return AnalysisResult(
+        domains_detected=[DOMAIN_NAMES[i] for i in domain_ids],
+        version_sensitive=version_sensitive,
+        ambiguity_flags=[
+            {"type": flag_type, "matched_text": matched_text, "suggestion": suggestion}
+            for flag_type, matched_text, suggestion in flags
+        ],
+        suggested_searches=list(searches),
+        confidence_assessment=confidence,
+    )
 
-    # Detect ambiguity
-    for ambiguity_type, patterns in AMBIGUITY_PATTERNS.items():
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                results["ambiguity_flags"].append({
-                    "type": ambiguity_type,
-                    "matched_text": match.group(0),
-                    "suggestion": get_clarification_suggestion(ambiguity_type),
-                })
-                break
 
-    # Generate search suggestions
-    results["suggested_searches"] = generate_search_suggestions(
-        text, results["domains_detected"], results["version_sensitive"]
+@functools.lru_cache(maxsize=256)
+def _analyze_cached(text: str) -> tuple:
+    """Run the analysis once per distinct text.
+
+    Returns an immutable snapshot so cached results cannot be mutated by
+    callers; analyze_text() rehydrates it into a fresh AnalysisResult.
+    """
+    return _analyze_stream((text,))
+
+
+def _analyze_stream(chunks) -> tuple:
+    """Core analysis over a sequence of line-aligned text windows."""
+    hits = set()
+    version_sensitive = False
+    found = {}
+    techs = {}
+
+    chunks = iter(chunks)
+    chunk = next(chunks, None)
+    while chunk is not None:
+        following = next(chunks, None)
+        # A window owns the matches starting inside it. The read-ahead only
+        # completes terms that continue past its last newline; matches
+        # starting there belong to the next window.
+        ahead = "" if following is None else _READ_AHEAD_RX.match(following).group(0)
+        text = chunk + ahead
+        matches = functools.partial(_matches_before, text=text, end=len(chunk))
+
+        # Casefold once for the literal detectors; casefolding can expand some
+        # characters (e.g. "ß"), so the owned end is taken from the folded chunk
+        folded_chunk = chunk.casefold()
+        folded = folded_chunk + ahead.casefold()
+        folded_matches = functools.partial(_matches_before, text=folded, end=len(folded_chunk))
+
+        # Detect domains
+        if len(hits) < len(DOMAIN_NAMES):
+            for match in folded_matches(ALL_DOMAINS_RX):
+                hits.add(_GROUP_DOMAIN_IDS[match.lastindex])
+                if len(hits) == len(DOMAIN_NAMES):
+                    break
+
+        # Check for version-sensitive content
+        if not version_sensitive and (
+            any(keyword in folded for keyword in _VERSION_KEYWORDS) or _DIGIT_RX.search(folded)
+        ):
+            version_sensitive = next(folded_matches(VERSION_RX), None) is not None
+
+        # Detect ambiguity
+        for ambiguity_type, regex in AMBIG_RX.items():
+            if ambiguity_type not in found and any(
+                literal in folded for literal in _AMBIGUITY_PREMATCHERS[ambiguity_type]
+            ):
+                for match in matches(regex):
+                    if not _is_excepted(ambiguity_type, match, text):
+                        found[ambiguity_type] = match.group(0)
+                        break
+
+        # Extract potential technology names. TECH_PATTERN needs an uppercase
+        # letter, and a window with one always differs from its casefolded
+        # copy, so all-lowercase windows skip the scan
+        if folded_chunk != chunk:
+            for match in matches(TECH_PATTERN):
+                techs[match.group(1)] = None
+
+        chunk = following
+
+    domain_ids = tuple(sorted(hits))
+    flags = tuple(
+        (ambiguity_type, found[ambiguity_type], get_clarification_suggestion(ambiguity_type))
+        for ambiguity_type in AMBIG_RX
+        if ambiguity_type in found
     )
 
+    # Generate search suggestions
+    searches = tuple(_suggestions_for(techs, domain_ids, version_sensitive))
+
     # Assess overall confidence
-    gap_count = len(results["domains_detected"]) + len(results["ambiguity_flags"])
+    gap_count = len(domain_ids) + len(flags)
     if gap_count == 0:
-        results["confidence_assessment"] = "high"
+        confidence = "high"
     elif gap_count <= 2:
-        results["confidence_assessment"] = "medium"
+        confidence = "medium"
     else:
-        results["confidence_assessment"] = "low"
-
-    return results
+        confidence = "low"
+
+    return domain_ids, version_sensitive, flags, searches, confidence
+
+
+def _analyze_path(path) -> AnalysisResult:
+    """Analyze a task file by streaming it in line-aligned windows."""
+    return analyze_chunks(_chunk_iter(path))
+
+
+def _is_excepted(ambiguity_type: str, match: re.Match, text: str) -> bool:
+    """Return True if an ambiguity match is clarified by the text right after it."""
+    if ambiguity_type != "scope" or not _SCOPE_EDIT_RX.fullmatch(match.group(0)):
+        return False
+    end = match.end()
+    line_end = text.find("\n", end)
+    if line_end == -1:
+        line_end = len(text)
+    window_end = min(line_end, end + SCOPE_EXCEPTION_WINDOW)
+    return _SCOPE_EXCEPTION_RX.search(text, end, window_end) is not None
+
+
+def _matches_before(regex: re.Pattern, text: str, end: int):
+    """Yield matches of `regex` in `text` that start before `end`."""
+    for match in regex.finditer(text):
+        if match.start() >= end:
+            return
+        yield match
+
+
+def _chunk_iter(path, size: int = CHUNK_SIZE):
+    """Yield a file's text as windows cut on line boundaries.
+
+    The file is read `size` characters at a time. Each read is cut before
+    the line holding its last non-blank character, and that line is carried
+    into the next window, so every window but the last ends with a newline
+    and every window but the first starts on a non-blank line. A line longer
+    than `size` is carried whole, so a window is never shorter than the
+    longest line in it.
+    """
+    pending = []
+    with open(path) as f:
+        for block in iter(functools.partial(f.read, size), ""):
+            cut = block.rfind("\n", 0, len(block.rstrip())) + 1
+            if not cut:
+                pending.append(block)
+                continue
+            pending.append(block[:cut])
+            yield "".join(pending)
+            pending = [block[cut:]]
+    tail = "".join(pending)
+    if tail:
+        yield tail
 
 
 def get_clarification_suggestion(ambiguity_type: str) -> str:
     """Return a suggestion for resolving a specific type of ambiguity."""
-    suggestions = {
-        "scope": "Clarify the exact boundaries of the task. What is included and excluded?",
-        "behavior": "Specify expected behavior for error/edge cases. What should happen when things go wrong?",
-        "architecture": "Identify the architectural constraints and preferences before choosing an approach.",
-        "priority": "Determine which sub-tasks are most important and should be addressed first.",
-    }
-    return suggestions.get(ambiguity_type, "Ask the user for more details.")
+    return _CLARIFICATION_SUGGESTIONS.get(ambiguity_type, "Ask the user for more details.")
 
 
 def generate_search_suggestions(text: str, domains: list, version_sensitive: bool) -> list:
     """Generate suggested search queries based on analysis."""
+    # Extract potential technology names (capitalized words, known patterns)
+    domain_ids = [DOMAIN_IDS[domain] for domain in domains if domain in DOMAIN_IDS]
+    return _suggestions_for(TECH_PATTERN.findall(text), domain_ids, version_sensitive)
+
+
+def _suggestions_for(tech_candidates, domain_ids, version_sensitive: bool) -> list:
+    """Build search queries from candidate tech names and domain ids.
+
+    Queries are deduplicated in order and capped at MAX_SUGGESTIONS; the
+    domain queries are always kept and tech queries fill the remaining slots.
+    """
+    domain_queries = [DOMAIN_QUERY_TUPLE[i] for i in domain_ids]
+    budget = MAX_SUGGESTIONS - len(domain_queries)
+
     suggestions = []
+    seen = set(domain_queries)
 
-    # Extract potential technology names (capitalized words, known patterns)
-    tech_pattern = r"\b([A-Z][a-zA-Z]+(?:\.js|\.py|\.rs)?)\b"
-    techs = set(re.findall(tech_pattern, text))
+    def _add(query: str) -> None:
+        if query not in seen:
+            seen.add(query)
+            suggestions.append(query)
 
-    for tech in techs:
-        if len(tech) > 2 and tech not in {"The", "This", "That", "When", "What", "How", "For"}:
-            suggestions.append(f"{tech} documentation official")
+    for tech in tech_candidates:
+        if len(suggestions) >= budget:
+            break
+        if tech.casefold() not in _STOPWORDS:
+            _add(f"{tech} documentation official")
             if version_sensitive:
-                suggestions.append(f"{tech} latest changes breaking changes 2026")
-
-    for domain in domains:
-        domain_queries = {
-            "legal": "current regulatory requirements compliance",
-            "finance": "accounting standards current rules",
-            "infrastructure": "deployment best practices current",
-            "security": "security best practices OWASP current",
-            "database": "database optimization patterns",
-            "frontend": "frontend framework best practices current",
-            "ml_ai": "machine learning implementation patterns current",
-        }
-        if domain in domain_queries:
-            suggestions.append(domain_queries[domain])
+                _add(f"{tech} latest changes breaking changes 2026")
 
+    del suggestions[budget:]
+    suggestions.extend(domain_queries)
     return suggestions
 
 
-def format_report(results: dict) -> str:
+# Fixed report framing, built once rather than on every report
+_RULE = "=" * 60
+_REPORT_HEADER = f"{_RULE}\nKNOWLEDGE GAP ASSESSMENT REPORT\n{_RULE}\n"
+_REPORT_FOOTER = f"\n{_RULE}\n"
+
+
+def format_report(results: AnalysisResult) -> str:
     """Format analysis results as a readable report."""
-    lines = []
-    lines.append("=" * 60)
-    lines.append("KNOWLEDGE GAP ASSESSMENT REPORT")
-    lines.append("=" * 60)
+    buffer = io.StringIO()
+    write_report(results, buffer)
+    return buffer.getvalue().removesuffix("\n")
+
+
+def write_report(results: AnalysisResult, file) -> None:
+    """Write the readable report straight to a text stream, line by line."""
+    write = file.write
+    domains = results.domains_detected
+    flags = results.ambiguity_flags
+    searches = results.suggested_searches
 
-    lines.append(f"\nOverall Confidence: {results['confidence_assessment'].upper()}")
+    write(_REPORT_HEADER)
+    write(f"\nOverall Confidence: {results.confidence_assessment.upper()}\n")
 
-    if results["domains_detected"]:
-        lines.append(f"\nDomains Detected: {', '.join(results['domains_detected'])}")
-        lines.append("  → Research these domains before implementing.")
+    if domains:
+        write(f"\nDomains Detected: {', '.join(domains)}\n")
+        write("  → Research these domains before implementing.\n")
     else:
-        lines.append("\nNo specialized domains detected.")
+        write("\nNo specialized domains detected.\n")
 
-    if results["version_sensitive"]:
-        lines.append("\nVersion-Sensitive Content: YES")
-        lines.append("  → Verify current versions and check for breaking changes.")
+    if results.version_sensitive:
+        write("\nVersion-Sensitive Content: YES\n")
+        write("  → Verify current versions and check for breaking changes.\n")
     else:
-        lines.append("\nVersion-Sensitive Content: No")
+        write("\nVersion-Sensitive Content: No\n")
 
-    if results["ambiguity_flags"]:
-        lines.append(f"\nAmbiguity Flags ({len(results['ambiguity_flags'])}):")
-        for flag in results["ambiguity_flags"]:
-            lines.append(f"  [{flag['type'].upper()}] Matched: \"{flag['matched_text']}\"")
-            lines.append(f"    → {flag['suggestion']}")
+    if flags:
+        write(f"\nAmbiguity Flags ({len(flags)}):\n")
+        for flag in flags:
+            write(f"  [{flag['type'].upper()}] Matched: \"{flag['matched_text']}\"\n")
+            write(f"    → {flag['suggestion']}\n")
     else:
-        lines.append("\nNo significant ambiguity detected.")
+        write("\nNo significant ambiguity detected.\n")
+
+    if searches:
+        write(f"\nSuggested Search Queries ({len(searches)}):\n")
+        for i, query in enumerate(searches, 1):
+            write(f"  {i}. {query}\n")
+
+    write(_REPORT_FOOTER)
+
+
+def _dumps(results: AnalysisResult) -> bytes:
+    """Serialize results as indented UTF-8 JSON, using orjson when it is installed.
+
+    Both backends write non-ASCII text unescaped and produce the same bytes.
+    """
+    # Imported lazily: only the --json path needs a serializer
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+    if orjson is not None:
+        try:
+            # orjson serializes dataclasses natively, without an intermediate dict
+            return orjson.dumps(results, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            # Raised for lone surrogates (undecodable bytes in argv), which
+            # the json module can still escape
+            pass
+    import json
+    # Lone surrogates have no UTF-8 form; inside a JSON string their
+    # backslashreplace form (\udcff) is the matching JSON escape
+    text = json.dumps(asdict(results), indent=2, ensure_ascii=False)
+    return text.encode(errors="backslashreplace")
+
+
+def write_json(results: AnalysisResult, file) -> None:
+    """Write results as JSON, straight to the binary layer when there is one."""
+    data = _dumps(results) + b"\n"
+    buffer = getattr(file, "buffer", None)
+    if buffer is None:
+        file.write(data.decode())
+        return
+    file.flush()
+    buffer.write(data)
+
+
+def _build_parser():
+    """Build the command-line parser."""
+    # Imported lazily, like json/orjson: only the CLI needs it
+    import argparse
+
+    # No abbreviations: _parse_args only splits text off the exact flags
+    parser = argparse.ArgumentParser(
+        prog="assess_knowledge_gaps.py",
+        description="Identify knowledge gaps and ambiguity in a task description.",
+        allow_abbrev=False,
+    )
+    parser.add_argument("inputs", nargs="*", metavar="FILE", help="task description file(s)")
+    parser.add_argument(
+        "--text", nargs=argparse.REMAINDER, metavar="WORD",
+        help="analyze the rest of the command line as text (stdin if nothing follows)",
+    )
+    parser.add_argument(
+        "--json", nargs=argparse.REMAINDER, metavar="WORD",
+        help="like --text, but print the analysis as JSON",
+    )
+    return parser
 
-    if results["suggested_searches"]:
-        lines.append(f"\nSuggested Search Queries ({len(results['suggested_searches'])}):")
-        for i, query in enumerate(results["suggested_searches"], 1):
-            lines.append(f"  {i}. {query}")
 
-    lines.append("\n" + "=" * 60)
-    return "\n".join(lines)
+# Options after which every token is task text
+_TEXT_OPTIONS = ("--text", "--json")
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage:")
-        print("  assess_knowledge_gaps.py <task-description-file>")
-        print('  assess_knowledge_gaps.py --text "Your task description"')
-        sys.exit(1)
+def _parse_args(parser, argv: list):
+    """Parse `argv`, keeping every token after --text or --json as task text.
 
-    if sys.argv[1] == "--text" and len(sys.argv) >= 3:
-        text = " ".join(sys.argv[2:])
-    elif sys.argv[1] == "--json":
-        text = " ".join(sys.argv[2:]) if len(sys.argv) >= 3 else sys.stdin.read()
+    argparse.REMAINDER still consumes a "--" among those words, so they are
+    split off by hand and only the options before them are parsed.
+    """
+    for i, arg in enumerate(argv):
+        if arg == "--":
+            break
+        if arg in _TEXT_OPTIONS:
+            args = parser.parse_args(argv[:i + 1])
+            setattr(args, arg.removeprefix("--"), argv[i + 1:])
+            return args
+    return parser.parse_args(argv)
+
+
+def main(argv=None, stdin=None, stdout=None, stderr=None) -> int:
+    """Run the CLI and return its exit status.
+
+    `argv` defaults to sys.argv[1:], and `stdin`/`stdout`/`stderr` to the
+    process streams, so the CLI can also be driven in-process.
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    stdin = sys.stdin if stdin is None else stdin
+    stdout = sys.stdout if stdout is None else stdout
+    stderr = sys.stderr if stderr is None else stderr
+
+    parser = _build_parser()
+    # argparse prints help and usage errors to the process streams and then
+    # raises SystemExit; keep both on the given streams and return the status
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            args = _parse_args(parser, argv)
+            words = args.text if args.json is None else args.json
+            if words is not None and args.inputs:
+                parser.error("FILE arguments cannot be combined with --text or --json")
+    except SystemExit as exc:
+        return exc.code
+
+    if not args.inputs and words is None:
+        parser.print_help(stdout)
+        return 1
+
+    if words is not None:
+        text = " ".join(words) if words else stdin.read()
         results = analyze_text(text)
-        print(json.dumps(results, indent=2))
-        sys.exit(0)
-    else:
-        file_path = Path(sys.argv[1])
-        if not file_path.exists():
-            print(f"Error: File not found: {file_path}")
-            sys.exit(1)
-        text = file_path.read_text()
-
-    results = analyze_text(text)
-    print(format_report(results))
+        if args.json is None:
+            write_report(results, stdout)
+        else:
+            write_json(results, stdout)
+        return 0
+
+    # Plain os.path checks: one stat per file, and no pathlib import
+    files = args.inputs
+    for file_path in files:
+        if not os.path.isfile(file_path):
+            print(f"Error: File not found: {file_path}", file=stdout)
+            return 1
+
+    if len(files) == 1:
+        write_report(_analyze_path(files[0]), stdout)
+        return 0
+
+    # Analysis is CPU-bound with no shared state: fan files out to processes
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # On Linux, fork workers so they inherit the patterns compiled at import
+    # instead of re-importing the module (spawn/forkserver). A fork pool
+    # starts all its workers up front, so it is sized to the number of files
+    mp_context = multiprocessing.get_context("fork") if sys.platform.startswith("linux") else None
+    max_workers = min(len(files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+        for file_path, results in zip(files, executor.map(_analyze_path, files)):
+            print(f"\n{file_path}", file=stdout)
+            write_report(results, stdout)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())